@@ -15,8 +15,12 @@ TRANSFORM_DROP_HOW = "all"  # 'all' or 'any'
 # Load settings
 LOAD_CHUNK_SIZE = 5000
 LOAD_IF_EXISTS = "append"  # fail, replace, append
+# Unlogged bulk loads are opt-in via the LOAD_UNLOGGED_BULK env var
+# (replace-loads skip WAL; data lost on a server crash mid-load)
 
 # Pipeline settings
+# Processed-artifact format is selected via the PROCESSED_FORMAT env var
+# (parquet when pyarrow is installed, else csv)
 PIPELINE_MAX_RETRIES = 3
 PIPELINE_RAW_DIR = "data/raw"
 PIPELINE_PROCESSED_DIR = "data/processed"
@@ -2,28 +2,40 @@
 Robust data extraction module with advanced features.
 Supports multiple formats, encoding detection, chunking, and validation.
 """
+from dataclasses import dataclass, field
 from pathlib import Path
+import io
+import os
 import pandas as pd
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union, IO
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # fall back to the single-threaded C parser
+    pa = None
+    pa_csv = None
+
 logger = logging.getLogger(__name__)
 
+_BANNER = '=' * 70
+
 class ExtractionError(Exception):
     """Raised when extraction fails."""
     pass
 
+@dataclass(slots=True)
 class ExtractionStats:
     """Track extraction statistics."""
-    def __init__(self):
-        self.file_size_mb = 0.0
-        self.rows_extracted = 0
-        self.columns_extracted = 0
-        self.encoding_detected = None
-        self.duration_seconds = 0.0
-        self.warnings = []
-    
+    file_size_mb: float = 0.0
+    rows_extracted: int = 0
+    columns_extracted: int = 0
+    encoding_detected: Optional[str] = None
+    duration_seconds: float = 0.0
+    warnings: list = field(default_factory=list)
+
     def report(self) -> str:
         """Generate extraction report."""
         report = f"""
@@ -39,6 +51,47 @@ class ExtractionStats:
 ╚════════════════════════════════════════╝"""
         return report
 
+def _read_file_uring(path: Path) -> bytes:
+    """
+    Read a whole file through io_uring with a single IORING_OP_READ.
+
+    Completion-based I/O skips the per-read syscall round trip that the
+    default pread path pays; needs the liburing bindings and a Linux
+    5.6+ kernel, and falls back to a plain blocking read otherwise.
+
+    Args:
+        path: Path to read
+
+    Returns:
+        bytes: The file contents
+    """
+    try:
+        import liburing
+    except ImportError:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    size = os.path.getsize(path)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        ring = liburing.io_uring()
+        liburing.io_uring_queue_init(1, ring, 0)
+        try:
+            buf = bytearray(size)
+            iov = liburing.iovec(buf)
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_read(sqe, fd, iov.iov_base, iov.iov_len, 0)
+            liburing.io_uring_submit(ring)
+            cqe = liburing.io_uring_cqe()
+            liburing.io_uring_wait_cqe(ring, cqe)
+            read = liburing.trap_error(cqe.res)
+            liburing.io_uring_cqe_seen(ring, cqe)
+            return bytes(buf[:read])
+        finally:
+            liburing.io_uring_queue_exit(ring)
+    finally:
+        os.close(fd)
+
 class DataExtractor:
     """Advanced data extractor supporting multiple formats and encodings."""
     
@@ -65,23 +118,34 @@ class DataExtractor:
         if not file_path.stat().st_size > 0:
             raise ExtractionError(f"File is empty: {file_path}")
     
-    def extract_csv(self, file_path: Path, 
+    def extract_csv(self, file_path: Union[Path, str, IO],
                    encoding: Optional[str] = 'utf-8',
                    delimiter: str = ',',
                    chunksize: Optional[int] = None,
                    dtype: Optional[Dict[str, Any]] = None,
-                   parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
+                   parse_dates: Optional[List[str]] = None,
+                   usecols: Optional[List[str]] = None,
+                   na_values: Optional[List[str]] = None,
+                   engine: Optional[str] = None,
+                   io_engine: Optional[str] = None) -> pd.DataFrame:
         """
         Extract data from CSV with robust error handling.
-        
+
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file, or an open file-like object
+                (anything with read(), e.g. io.BytesIO)
             encoding: File encoding (default: utf-8)
             delimiter: CSV delimiter (default: ,)
             chunksize: Rows per chunk for large files (None = full load)
             dtype: Column data types
             parse_dates: Columns to parse as dates
-            
+            usecols: Columns to read; others are skipped by the parser
+            na_values: Additional strings to treat as missing
+            engine: 'polars' opts into the polars reader (multithreaded
+                parse, zero-copy Arrow handoff); None picks the default
+            io_engine: 'uring' reads the file via io_uring (when the
+                liburing bindings are present) before parsing in memory
+
         Returns:
             pd.DataFrame: Extracted data
             
@@ -90,38 +154,117 @@ class DataExtractor:
         """
         start_time = datetime.now()
         self.stats = ExtractionStats()
-        file_path = Path(file_path)
-        
+        # pandas' filepath_or_buffer contract: anything with read() is
+        # streamed directly, with no path validation or disk round-trip
+        is_buffer = hasattr(file_path, 'read')
+        if not is_buffer:
+            file_path = Path(file_path)
+        source_name = '<buffer>' if is_buffer else file_path.name
+
         try:
-            logger.info(f"{'='*70}")
-            logger.info(f"EXTRACTING: {file_path.name}")
-            logger.info(f"{'='*70}")
-            
-            # Validate file
-            self.validate_file(file_path)
-            
-            # Get file size
-            self.stats.file_size_mb = file_path.stat().st_size / (1024 * 1024)
-            logger.info(f"File size: {self.stats.file_size_mb:.2f} MB")
+            logger.info(_BANNER)
+            logger.info(f"EXTRACTING: {source_name}")
+            logger.info(_BANNER)
+
+            if not is_buffer:
+                # Validate file
+                self.validate_file(file_path)
+
+                # Get file size
+                self.stats.file_size_mb = file_path.stat().st_size / (1024 * 1024)
+                logger.info(f"File size: {self.stats.file_size_mb:.2f} MB")
             self.stats.encoding_detected = encoding
-            
+
+            if io_engine == 'uring' and not is_buffer:
+                # One submission-queue entry pulls in the whole file;
+                # the parser then runs over an in-memory buffer
+                file_path = io.BytesIO(_read_file_uring(file_path))
+                is_buffer = True
+
             # Handle large files with chunking
-            if chunksize and self.stats.file_size_mb > 50:
+            if engine == 'polars':
+                try:
+                    import polars as pl
+                except ImportError as e:
+                    raise ExtractionError(
+                        "polars is required for engine='polars'"
+                    ) from e
+                # Multithreaded Rust parser; the Arrow buffers transfer
+                # to pandas without a row-wise copy
+                logger.info("Loading file via the polars engine...")
+                source = file_path if is_buffer else str(file_path)
+                df = pl.read_csv(source, separator=delimiter).to_pandas(
+                    use_pyarrow_extension_array=True
+                )
+            elif chunksize and self.stats.file_size_mb > 50:
                 logger.info(f"Using chunked reading (chunk size: {chunksize})")
-                chunks = []
-                for chunk in pd.read_csv(
+                # The Arrow reader has no mapping for pandas-level dtype
+                # or parse_dates hints; honoring them must not depend on
+                # file size, so those calls take the pandas path below
+                if pa_csv is not None and dtype is None and parse_dates is None:
+                    # Read record batches and concatenate at the Arrow
+                    # level (zero-copy for compatible schemas); pandas-
+                    # level concat would fully copy and double peak RSS
+                    read_options = pa_csv.ReadOptions(
+                        block_size=64 << 20, encoding=encoding or 'utf-8'
+                    )
+                    parse_options = pa_csv.ParseOptions(delimiter=delimiter)
+                    convert_kwargs = {}
+                    if usecols:
+                        convert_kwargs['include_columns'] = list(usecols)
+                    if na_values:
+                        convert_kwargs['null_values'] = list(na_values)
+                    with pa_csv.open_csv(
+                        file_path,
+                        read_options=read_options,
+                        parse_options=parse_options,
+                        convert_options=pa_csv.ConvertOptions(**convert_kwargs)
+                    ) as batch_reader:
+                        tables = [
+                            pa.Table.from_batches([batch])
+                            for batch in batch_reader
+                        ]
+                    combined = pa.concat_tables(tables, promote_options='default')
+                    del tables
+                    # self_destruct frees the Arrow buffers as pandas
+                    # takes ownership, avoiding a 2x memory spike
+                    df = combined.to_pandas(
+                        self_destruct=True, types_mapper=pd.ArrowDtype
+                    )
+                    del combined
+                else:
+                    chunks = []
+                    for chunk in pd.read_csv(
+                        file_path,
+                        encoding=encoding,
+                        delimiter=delimiter,
+                        dtype=dtype,
+                        parse_dates=parse_dates,
+                        usecols=usecols,
+                        na_values=na_values,
+                        chunksize=chunksize,
+                        on_bad_lines='warn',
+                        engine='c',
+                        memory_map=True
+                    ):
+                        chunks.append(chunk)
+                    df = pd.concat(chunks, ignore_index=True)
+                    logger.info(f"Concatenated {len(chunks)} chunks")
+            elif pa is not None:
+                # Multithreaded parse with Arrow-backed dtypes: strings
+                # stay in Arrow buffers instead of Python object arrays
+                logger.info("Loading file via the pyarrow engine...")
+                df = pd.read_csv(
                     file_path,
                     encoding=encoding,
                     delimiter=delimiter,
                     dtype=dtype,
                     parse_dates=parse_dates,
-                    chunksize=chunksize,
-                    on_bad_lines='warn',
-                    engine='c'
-                ):
-                    chunks.append(chunk)
-                df = pd.concat(chunks, ignore_index=True)
-                logger.info(f"Concatenated {len(chunks)} chunks")
+                    usecols=usecols,
+                    na_values=na_values,
+                    engine='pyarrow',
+                    dtype_backend='pyarrow'
+                )
             else:
                 # Load entire file
                 logger.info("Loading file into memory...")
@@ -131,10 +274,14 @@ class DataExtractor:
                     delimiter=delimiter,
                     dtype=dtype,
                     parse_dates=parse_dates,
+                    usecols=usecols,
+                    na_values=na_values,
                     on_bad_lines='warn',
-                    engine='c'
+                    engine='c',
+                    # mmap only applies to real files, not buffers
+                    memory_map=not is_buffer
                 )
-            
+
             # Validate extracted data
             if df.empty:
                 logger.warning("Extracted DataFrame is empty!")
@@ -144,7 +291,8 @@ class DataExtractor:
             self.stats.columns_extracted = len(df.columns)
             self.stats.duration_seconds = (datetime.now() - start_time).total_seconds()
             
-            logger.info(self.stats.report())
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(self.stats.report())
             logger.info(f"✓ Extraction successful in {self.stats.duration_seconds:.2f}s")
             
             return df
@@ -164,11 +312,106 @@ class DataExtractor:
             logger.error(msg)
             raise ExtractionError(msg) from e
 
-def extract_csv(path: Path, **kwargs) -> pd.DataFrame:
-    """Convenience function for CSV extraction."""
+def _pick_read_chunksize(path: Path, sample_bytes: int = 1 << 20,
+                         target_bytes: int = 128 << 20) -> int:
+    """
+    Choose a row chunksize targeting ~128MB blocks for the CSV parser.
+
+    Samples the first megabyte to estimate bytes per row; large blocks
+    keep the parser cache-friendly while small rows don't explode the
+    chunk count.
+
+    Args:
+        path: Path to CSV file
+        sample_bytes: Bytes to sample for the row-width estimate
+        target_bytes: Desired block size in bytes
+
+    Returns:
+        int: Rows per chunk (at least 10,000)
+    """
+    try:
+        with open(path, 'rb') as f:
+            sample = f.read(sample_bytes)
+        rows = sample.count(b'\n')
+        if rows == 0:
+            return 100_000
+        bytes_per_row = max(len(sample) // rows, 1)
+        return max(10_000, target_bytes // bytes_per_row)
+    except OSError:
+        return 100_000
+
+def extract_csv(path: Union[Path, str, IO],
+                chunksize: Optional[int] = None, **kwargs):
+    """
+    Convenience function for CSV extraction.
+
+    With chunksize set, returns a chunk iterator (see extract_csv_iter)
+    instead of a materialized DataFrame, so peak memory stays bounded by
+    one chunk; without it, returns the full DataFrame.
+    """
+    if chunksize is not None:
+        return extract_csv_iter(path, chunksize=chunksize, **kwargs)
     extractor = DataExtractor()
     return extractor.extract_csv(path, **kwargs)
 
+def extract_csv_iter(path: Union[Path, str, IO],
+                     chunksize: Optional[int] = None,
+                     encoding: Optional[str] = 'utf-8',
+                     delimiter: str = ',',
+                     dtype: Optional[Dict[str, Any]] = None,
+                     parse_dates: Optional[List[str]] = None,
+                     usecols: Optional[List[str]] = None,
+                     na_values: Optional[List[str]] = None):
+    """
+    Stream a CSV in chunks without materializing the full DataFrame.
+
+    Unlike extract_csv, this never concatenates chunks, so peak memory is
+    bounded by a single chunk and files larger than RAM can be processed.
+
+    Args:
+        path: Path to CSV file, or an open file-like object (anything
+            with read(), e.g. io.BytesIO)
+        chunksize: Rows per yielded chunk (None picks one from file
+            size; buffers fall back to a fixed default)
+        encoding: File encoding (default: utf-8)
+        delimiter: CSV delimiter (default: ,)
+        dtype: Column data types
+        parse_dates: Columns to parse as dates
+        usecols: Columns to read; others are skipped by the parser
+        na_values: Additional strings to treat as missing
+
+    Returns:
+        pd.io.parsers.TextFileReader: Iterator of DataFrame chunks
+        (usable as a context manager)
+
+    Raises:
+        ExtractionError: If the file fails validation
+    """
+    # Buffers skip path validation and size sampling, same as extract_csv
+    is_buffer = hasattr(path, 'read')
+    if not is_buffer:
+        path = Path(path)
+        DataExtractor().validate_file(path)
+    if chunksize is None:
+        chunksize = 100_000 if is_buffer else _pick_read_chunksize(path)
+    source_name = '<buffer>' if is_buffer else path.name
+    logger.info(f"Streaming {source_name} in chunks of {chunksize:,d} rows")
+    return pd.read_csv(
+        path,
+        encoding=encoding,
+        delimiter=delimiter,
+        dtype=dtype,
+        parse_dates=parse_dates,
+        usecols=usecols,
+        na_values=na_values,
+        chunksize=chunksize,
+        on_bad_lines='warn',
+        engine='c',
+        # mmap the input so the parser reads pages in place instead of
+        # paying a copy per read() call (only applies to real files)
+        memory_map=not is_buffer
+    )
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.INFO,
@@ -179,6 +422,7 @@ if __name__ == "__main__":
         print("Usage: python -m src.extract.extract_data <csv_file>")
         sys.exit(1)
     
-    df = extract_csv(Path(sys.argv[1]), chunksize=10000)
+    csv_path = Path(sys.argv[1])
+    df = DataExtractor().extract_csv(csv_path, chunksize=_pick_read_chunksize(csv_path))
     print(f"\nExtracted:\n{df.head()}")
     print(f"\nData types:\n{df.dtypes}")
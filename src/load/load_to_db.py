@@ -1,8 +1,12 @@
 """
 Robust database loading module with connection pooling and transaction management.
 """
+import atexit
+import functools
+import io
 import os
 import logging
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
@@ -11,19 +15,26 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_BANNER = '=' * 70
+
+# Create replaced tables UNLOGGED for the bulk load and switch them to
+# LOGGED afterwards, skipping WAL writes during the COPY. Opt-in: an
+# UNLOGGED table is lost if the server crashes mid-load.
+LOAD_UNLOGGED_BULK = os.getenv("LOAD_UNLOGGED_BULK", "").lower() in ("1", "true", "yes")
+
 class LoadError(Exception):
     """Raised when loading fails."""
     pass
 
+@dataclass(slots=True)
 class LoadStats:
     """Track loading statistics."""
-    def __init__(self):
-        self.rows_attempted = 0
-        self.rows_loaded = 0
-        self.rows_failed = 0
-        self.duration_seconds = 0.0
-        self.table_name = None
-    
+    rows_attempted: int = 0
+    rows_loaded: int = 0
+    rows_failed: int = 0
+    duration_seconds: float = 0.0
+    table_name: Optional[str] = None
+
     def report(self) -> str:
         """Generate loading report."""
         success_pct = (self.rows_loaded / self.rows_attempted * 100) if self.rows_attempted > 0 else 0
@@ -39,6 +50,34 @@ class LoadStats:
 ║ Duration:  {self.duration_seconds:>28.2f}s ║
 ╚════════════════════════════════════════╝"""
 
+@functools.lru_cache(maxsize=4)
+def _get_engine(user: str, password: str, host: str, port: int, database: str):
+    """
+    Create (and cache) a pooled engine for the given connection params.
+
+    The engine owns a connection pool, so rebuilding it per load throws
+    the pool away each time. Caching by connection params lets every
+    load in a pipeline run share one pool; pools are disposed at
+    interpreter exit.
+    """
+    conn_str = f"postgresql://{user}:{password}@{host}:{port}/{database}"
+    engine = create_engine(
+        conn_str,
+        echo=False,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+        # psycopg2 fast execution helpers: batch INSERTs instead of
+        # one round-trip per row on any non-COPY path (the VALUES page
+        # size is the core insertmanyvalues knob in SQLAlchemy 2.0)
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=10000,
+        executemany_batch_page_size=1000
+    )
+    atexit.register(engine.dispose)
+    return engine
+
 class DatabaseManager:
     """Manage database connections and operations."""
     
@@ -57,32 +96,27 @@ class DatabaseManager:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
     
     def connect(self) -> None:
-        """Establish database connection."""
+        """Establish database connection (reuses the cached pooled engine)."""
         try:
             logger.info(f"Connecting to {self.host}:{self.port}/{self.database}...")
-            conn_str = self.build_connection_string()
-            self.engine = create_engine(
-                conn_str,
-                echo=False,
-                pool_size=10,
-                max_overflow=20,
-                pool_recycle=3600,
-                pool_pre_ping=True
+            self.engine = _get_engine(
+                self.user, self.password, self.host, self.port, self.database
             )
-            # Test connection
-            with self.engine.connect() as conn:
-                pass
-            logger.info("✓ Database connection successful")
+            # pool_pre_ping already validates connections on checkout, so
+            # an eager handshake here would just add a round-trip; opt in
+            # via DB_HEALTHCHECK when a hard precheck is wanted
+            if os.getenv("DB_HEALTHCHECK"):
+                with self.engine.connect() as conn:
+                    pass
+            logger.info("✓ Database engine ready")
         except SQLAlchemyError as e:
             msg = f"Failed to connect to database: {e}"
             logger.error(msg)
             raise LoadError(msg) from e
-    
+
     def disconnect(self) -> None:
-        """Close database connection."""
-        if self.engine:
-            self.engine.dispose()
-            logger.debug("Database connection closed")
+        """Release the engine reference; the shared pool is disposed at exit."""
+        self.engine = None
     
     def table_exists(self, table_name: str) -> bool:
         """Check if table exists."""
@@ -107,20 +141,139 @@ class DatabaseManager:
             logger.warning(f"Could not get table info: {e}")
             return {}
 
-def load_df_to_postgres(df: pd.DataFrame, table_name: str, 
-                       if_exists: str = 'append', 
-                       chunk_size: int = 5000,
-                       validate_schema: bool = True) -> int:
+def _quote_ident(name: str) -> str:
+    """Quote a SQL identifier for interpolation into raw statements."""
+    return '"' + name.replace('"', '""') + '"'
+
+def _pick_load_chunksize(df: pd.DataFrame) -> int:
+    """
+    Choose rows per insert batch for this frame.
+
+    Stays under psycopg2's 65,535 bound-parameter limit for wide frames
+    and below the ~10k-row point where PostgreSQL insert throughput
+    stops improving.
+    """
+    return min(10000, max(1000, 65535 // max(len(df.columns), 1)))
+
+def _copy_from_dataframe(engine, df: pd.DataFrame, table_name: str,
+                         if_exists: str = 'append',
+                         chunk_size: Optional[int] = None) -> int:
+    """
+    Bulk-load a DataFrame via PostgreSQL COPY ... FROM STDIN.
+
+    Streams the frame as CSV through psycopg2's copy_expert, bypassing
+    per-row INSERT statements entirely. The table is created (or replaced)
+    first via an empty to_sql call so COPY always has a target.
+
+    Args:
+        engine: SQLAlchemy engine bound to a PostgreSQL database
+        df: DataFrame to load
+        table_name: Target table name
+        if_exists: 'fail', 'replace', 'append'
+        chunk_size: Rows serialized per COPY flush (bounds peak memory;
+            None picks one from the frame width)
+
+    Returns:
+        Number of rows loaded
+    """
+    unlogged = (LOAD_UNLOGGED_BULK and if_exists == 'replace'
+                and engine.dialect.name == 'postgresql')
+
+    if unlogged:
+        # Recreate the table UNLOGGED so the COPY skips WAL entirely;
+        # the name comes from filenames, so always quote it
+        logger.info(f"Bulk-loading '{table_name}' as UNLOGGED (WAL skipped)")
+        ident = _quote_ident(table_name)
+        schema_sql = pd.io.sql.get_schema(df, table_name, con=engine)
+        schema_sql = schema_sql.replace('CREATE TABLE', 'CREATE UNLOGGED TABLE', 1)
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE IF EXISTS {ident}'))
+            conn.execute(text(schema_sql))
+    else:
+        # Create/replace the table from the schema only; data goes in via COPY
+        df.head(0).to_sql(table_name, engine, if_exists=if_exists, index=False)
+
+    raw_conn = engine.raw_connection()
+    try:
+        rows = _copy_chunks(raw_conn, df, table_name, chunk_size=chunk_size)
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
+    if unlogged:
+        # Durable from here on; refresh stats for the planner too
+        ident = _quote_ident(table_name)
+        with engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE {ident} SET LOGGED'))
+            conn.execute(text(f'ANALYZE {ident}'))
+
+    return rows
+
+def _copy_chunks(raw_conn, df: pd.DataFrame, table_name: str,
+                 chunk_size: Optional[int] = None) -> int:
+    """
+    COPY a DataFrame into an already-open raw connection.
+
+    Does not commit: the caller owns the transaction, which lets many
+    frames (e.g. every chunk of a streamed file) share a single commit
+    instead of paying one fsync each.
+
+    Args:
+        raw_conn: Open DBAPI connection (psycopg2)
+        df: DataFrame to load; the target table must already exist
+        table_name: Target table name
+        chunk_size: Rows serialized per COPY flush (None picks one from
+            the frame width)
+
+    Returns:
+        Number of rows written (uncommitted)
+    """
+    if chunk_size is None:
+        chunk_size = _pick_load_chunksize(df)
+
+    cols = ', '.join(_quote_ident(str(c)) for c in df.columns)
+    # Quote the target like to_sql does at creation time, or names that
+    # need quoting (dashes, spaces, mixed case) break between the two
+    copy_sql = (f"COPY {_quote_ident(table_name)} ({cols}) "
+                f"FROM STDIN WITH (FORMAT CSV, NULL '\\N')")
+
+    with raw_conn.cursor() as cur:
+        # Flush in chunks so serialization never doubles peak memory
+        for start in range(0, len(df), chunk_size):
+            buf = io.StringIO()
+            df.iloc[start:start + chunk_size].to_csv(
+                buf, index=False, header=False, na_rep='\\N'
+            )
+            buf.seek(0)
+            cur.copy_expert(copy_sql, buf)
+
+    return len(df)
+
+def load_df_to_postgres(df: pd.DataFrame, table_name: str,
+                       if_exists: str = 'append',
+                       chunk_size: Optional[int] = None,
+                       validate_schema: bool = True,
+                       engine=None,
+                       conn=None) -> int:
     """
     Load DataFrame to PostgreSQL with comprehensive error handling.
-    
+
     Args:
         df: DataFrame to load
         table_name: Target table name
         if_exists: 'fail', 'replace', 'append'
-        chunk_size: Rows per chunk
+        chunk_size: Rows per chunk (None picks one from the frame width)
         validate_schema: Validate schema before loading
-        
+        engine: Optional pre-built engine; when None the cached
+            module-level engine for the configured params is used
+        conn: Optional open DBAPI connection (e.g. checked out of a
+            psycopg2 pool); skips engine construction and the per-call
+            TCP+auth handshake entirely. The target table must already
+            exist, and the connection stays open for the caller.
+
     Returns:
         Number of rows loaded
         
@@ -145,17 +298,36 @@ def load_df_to_postgres(df: pd.DataFrame, table_name: str,
     if df.empty:
         logger.warning("DataFrame is empty, skipping load")
         return 0
-    
+
+    if conn is not None:
+        # Caller-pooled connection: COPY straight through it, no engine
+        try:
+            rows = _copy_chunks(conn, df, table_name, chunk_size=chunk_size)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            msg = f"Error loading to '{table_name}' via injected connection: {e}"
+            logger.error(msg)
+            raise LoadError(msg) from e
+        stats.rows_loaded = rows
+        stats.duration_seconds = (datetime.now() - start).total_seconds()
+        logger.info(f"✓ Loaded {rows:,d} rows into '{table_name}' "
+                    f"in {stats.duration_seconds:.2f}s (pooled connection)")
+        return rows
+
     db_manager = DatabaseManager()
-    
+
     try:
-        logger.info(f"{'='*70}")
+        logger.info(_BANNER)
         logger.info(f"LOADING TO DATABASE: {table_name}")
-        logger.info(f"{'='*70}")
-        
-        # Connect
-        db_manager.connect()
-        
+        logger.info(_BANNER)
+
+        # Connect (or adopt the caller's engine)
+        if engine is not None:
+            db_manager.engine = engine
+        else:
+            db_manager.connect()
+
         # Validate schema if replacing
         if if_exists == 'replace' and validate_schema:
             logger.info(f"Creating/replacing table '{table_name}'...")
@@ -165,22 +337,35 @@ def load_df_to_postgres(df: pd.DataFrame, table_name: str,
                 logger.info(f"Appending to existing table with {len(info.get('columns', []))} columns")
         
         # Load data with chunking
+        if chunk_size is None:
+            chunk_size = _pick_load_chunksize(df)
         logger.info(f"Loading {len(df):,d} rows (chunk size: {chunk_size})...")
-        
-        df.to_sql(
-            table_name,
-            db_manager.engine,
-            if_exists=if_exists,
-            index=False,
-            chunksize=chunk_size,
-            method='multi'
-        )
+
+        if db_manager.engine.dialect.name == 'postgresql':
+            # Fast path: stream through COPY FROM STDIN
+            _copy_from_dataframe(
+                db_manager.engine, df, table_name,
+                if_exists=if_exists,
+                chunk_size=chunk_size
+            )
+        else:
+            # Non-PostgreSQL dialects fall back to batched INSERTs; the
+            # driver batches natively, so method='multi' (which builds
+            # pathological SQL strings on wide frames) is not needed
+            df.to_sql(
+                table_name,
+                db_manager.engine,
+                if_exists=if_exists,
+                index=False,
+                chunksize=chunk_size
+            )
         
         stats.rows_loaded = len(df)
         stats.rows_failed = 0
         stats.duration_seconds = (datetime.now() - start).total_seconds()
         
-        logger.info(stats.report())
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(stats.report())
         logger.info(f"✓ Load successful in {stats.duration_seconds:.2f}s\n")
         
         return stats.rows_loaded
@@ -193,8 +378,47 @@ def load_df_to_postgres(df: pd.DataFrame, table_name: str,
         msg = f"Unexpected error loading to '{table_name}': {e}"
         logger.error(msg)
         raise LoadError(msg) from e
+
+async def load_df_to_postgres_async(df: pd.DataFrame, table_name: str,
+                                    conn=None, **connect_kwargs) -> int:
+    """
+    Bulk-load a DataFrame through asyncpg's binary COPY protocol.
+
+    copy_records_to_table streams tuples over the COPY wire format in a
+    single round trip, the fastest known client-side path into
+    PostgreSQL; the target table must already exist.
+
+    Args:
+        df: DataFrame to load
+        table_name: Target table name
+        conn: Open asyncpg connection; when None one is created from
+            connect_kwargs (requires asyncpg) and closed afterwards
+        **connect_kwargs: Passed to asyncpg.connect when conn is None
+
+    Returns:
+        Number of rows loaded
+
+    Raises:
+        LoadError: If asyncpg is not installed and no connection was given
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise LoadError("asyncpg is required for the async load path") from e
+        conn = await asyncpg.connect(**connect_kwargs)
+    try:
+        await conn.copy_records_to_table(
+            table_name,
+            records=df.itertuples(index=False, name=None),
+            columns=list(df.columns)
+        )
     finally:
-        db_manager.disconnect()
+        if owns_conn:
+            await conn.close()
+    logger.info(f"✓ Async COPY loaded {len(df):,d} rows into '{table_name}'")
+    return len(df)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -1,14 +1,34 @@
+import atexit
+import hashlib
+import multiprocessing
 import os
+import shutil
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 import logging
 import sys
 from datetime import datetime
 import traceback
 from dotenv import load_dotenv
+import pandas as pd
 
-from src.extract.extract_data import extract_csv, ExtractionError
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # caching is skipped when pyarrow is unavailable
+    pa = None
+    pq = None
+
+try:
+    import yaml
+except ImportError:  # schema sidecars are skipped when PyYAML is unavailable
+    yaml = None
+
+from src.extract.extract_data import extract_csv_iter, ExtractionError
 from src.transform.transform_data import transform, TransformError
-from src.load.load_to_db import load_df_to_postgres, LoadError
+from src.load.load_to_db import DatabaseManager, LoadError, _copy_chunks
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,30 +38,118 @@ log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 log_file = log_dir / "pipeline.log"
 
+# Log records go through a queue to a background listener thread that
+# owns the file/stream handlers, so the per-chunk hot path never blocks
+# on disk I/O. A multiprocessing queue lets forked workers funnel their
+# records to the parent's listener as well.
+_log_queue = multiprocessing.Queue(-1)
+
+_formatter = logging.Formatter("%(asctime)s %(levelname)s:%(name)s:%(message)s")
+_file_handler = logging.FileHandler(log_file)
+_file_handler.setFormatter(_formatter)
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(_formatter)
+
+_log_listener = QueueListener(
+    _log_queue, _file_handler, _stream_handler, respect_handler_level=True
+)
+_log_listener.start()
+
+def _stop_log_listener():
+    # The queue's feeder thread starts lazily on first put; if nothing
+    # was ever logged, stop()'s sentinel put tries to spawn it during
+    # interpreter shutdown and raises RuntimeError
+    try:
+        _log_listener.stop()
+    except RuntimeError:
+        pass
+
+atexit.register(_stop_log_listener)
+
+# Message-only formatter: the listener's handlers apply the real format,
+# so the queue side must not bake a prefix into the record first
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s %(levelname)s:%(name)s:%(message)s",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[_queue_handler]
 )
 
 logger = logging.getLogger(__name__)
 
 RAW_DIR = Path("data/raw")
 PROCESSED_DIR = Path("data/processed")
+CACHE_DIR = Path("data/cache")
+
+# Format for data/processed artifacts: 'parquet' (zstd-compressed,
+# columnar, much smaller and faster to re-read) or 'csv' for legacy
+# downstream consumers
+PROCESSED_FORMAT = os.getenv(
+    "PROCESSED_FORMAT", "parquet" if pq is not None else "csv"
+)
+
+# Bump whenever transform behavior changes so stale cache entries miss
+TRANSFORM_VERSION = 3
+
+def _cache_key(path: Path) -> str:
+    """Cache key for a raw file: identity (path, mtime, size) + transform version."""
+    st = path.stat()
+    sidecar = path.with_suffix('.schema.yml')
+    sidecar_token = sidecar.stat().st_mtime_ns if sidecar.exists() else 0
+    raw = f"{path}:{st.st_mtime_ns}:{st.st_size}:{sidecar_token}:{TRANSFORM_VERSION}"
+    return hashlib.blake2b(raw.encode()).hexdigest()[:16]
+
+def _load_schema_sidecar(csv_file: Path) -> dict:
+    """
+    Load per-file reader hints from <name>.schema.yml, if present.
+
+    The sidecar may define usecols, dtypes, parse_dates, and na_values;
+    pushing these into the CSV reader lets the parser skip unwanted
+    columns and infer types in a single pass.
 
+    Returns:
+        dict: Keyword arguments for extract_csv_iter (empty when no
+        sidecar exists or PyYAML is not installed)
+    """
+    sidecar = csv_file.with_suffix('.schema.yml')
+    if yaml is None or not sidecar.exists():
+        return {}
+    try:
+        spec = yaml.safe_load(sidecar.read_text()) or {}
+    except Exception as e:
+        logger.warning(f"Ignoring invalid schema sidecar {sidecar.name}: {e}")
+        return {}
+    kwargs = {
+        'usecols': spec.get('usecols'),
+        'dtype': spec.get('dtypes'),
+        'parse_dates': spec.get('parse_dates'),
+        'na_values': spec.get('na_values'),
+    }
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    if kwargs:
+        logger.info(f"Applying schema sidecar {sidecar.name}: {sorted(kwargs)}")
+    return kwargs
+
+@dataclass(slots=True)
 class PipelineStats:
     """Track pipeline execution statistics."""
-    def __init__(self):
-        self.files_processed = 0
-        self.files_failed = 0
-        self.rows_extracted = 0
-        self.rows_transformed = 0
-        self.rows_loaded = 0
-        self.errors = []
-    
+    files_processed: int = 0
+    files_failed: int = 0
+    rows_extracted: int = 0
+    rows_transformed: int = 0
+    rows_loaded: int = 0
+    errors: list = field(default_factory=list)
+
+    def merge(self, result: dict) -> None:
+        """Fold a worker's result dict into these stats."""
+        self.files_processed += result.get('files_processed', 0)
+        self.files_failed += result.get('files_failed', 0)
+        self.rows_extracted += result.get('rows_extracted', 0)
+        self.rows_transformed += result.get('rows_transformed', 0)
+        self.rows_loaded += result.get('rows_loaded', 0)
+        self.errors.extend(result.get('errors', []))
+
     def log_stats(self):
         """Log final statistics."""
         logger.info("=" * 80)
@@ -59,15 +167,38 @@ class PipelineStats:
         
         logger.info("=" * 80)
 
-def process_file(csv_file: Path, stats: PipelineStats, max_retries: int = 3) -> bool:
+def _widen_schema(schema):
+    """
+    Widen integer columns to float64 for a streaming Parquet writer.
+
+    A ParquetWriter is fixed to one schema, but pandas re-infers an
+    integer column as float64 the moment a chunk contains its first NaN
+    — so a later chunk could no longer be written against an int-typed
+    first-chunk schema. Widening up front lets every chunk cast
+    losslessly, at the cost of ints becoming floats in the artifact.
+    """
+    return pa.schema([
+        f.with_type(pa.float64()) if pa.types.is_integer(f.type) else f
+        for f in schema
+    ])
+
+def process_file(csv_file: Path, stats: PipelineStats, max_retries: int = 3,
+                 engine=None) -> bool:
     """
     Process a single CSV file through the ETL pipeline with retry logic.
-    
+
+    Note that the streaming path applies transform() per chunk: duplicate
+    removal and dtype inference each see one chunk at a time, so
+    duplicates spanning chunk boundaries survive and dtype decisions can
+    differ between chunks (Parquet output unifies them by widening
+    integers to float64).
+
     Args:
         csv_file: Path to CSV file
         stats: Pipeline statistics tracker
         max_retries: Number of retry attempts
-        
+        engine: Shared database engine; None skips the load step
+
     Returns:
         bool: True if successful, False if failed
     """
@@ -75,35 +206,169 @@ def process_file(csv_file: Path, stats: PipelineStats, max_retries: int = 3) ->
     logger.info(f"Processing: {csv_file.name}")
     logger.info(f"{'='*60}")
     
+    cache_path = CACHE_DIR / f"{_cache_key(csv_file)}.parquet"
+    read_kwargs = _load_schema_sidecar(csv_file)
+    # Explicit dtypes from the sidecar make the inference pass redundant
+    convert_types = 'dtype' not in read_kwargs
+
+    use_parquet = PROCESSED_FORMAT == 'parquet' and pq is not None
+    if PROCESSED_FORMAT == 'parquet' and pq is None:
+        logger.warning("PROCESSED_FORMAT=parquet requires pyarrow; writing CSV")
+
     for attempt in range(1, max_retries + 1):
         try:
-            # Extract
-            logger.info(f"[Attempt {attempt}/{max_retries}] Extracting...")
-            df = extract_csv(csv_file)
-            stats.rows_extracted += len(df)
-            
-            # Transform
-            logger.info("Transforming...")
-            df_transformed = transform(df, normalize_cols=True, handle_missing='drop_all')
-            stats.rows_transformed += len(df_transformed)
-            
-            # Save processed file
-            out_file = PROCESSED_DIR / csv_file.name
-            logger.info(f"Saving to {out_file}...")
-            df_transformed.to_csv(out_file, index=False)
-            logger.info(f"Saved {len(df_transformed)} rows")
-            
-            # Load to database (optional, skip if DB not available)
-            if os.getenv("POSTGRES_HOST"):
-                try:
-                    logger.info("Loading to database...")
-                    loaded = load_df_to_postgres(df_transformed, csv_file.stem)
-                    stats.rows_loaded += loaded
-                except LoadError as e:
-                    logger.warning(f"Database load skipped: {e}")
+            if use_parquet:
+                out_file = (PROCESSED_DIR / csv_file.stem).with_suffix('.parquet')
             else:
-                logger.debug("POSTGRES_HOST not set, skipping database load")
-            
+                out_file = PROCESSED_DIR / csv_file.name
+            out_file.unlink(missing_ok=True)
+            rows_saved = 0
+            load_enabled = engine is not None
+
+            # Fresh cached artifact: skip extract + transform entirely.
+            # Replayed batch by batch so a cache hit stays within the same
+            # memory bounds as the streaming run that produced it.
+            if pq is not None and cache_path.exists():
+                logger.info(f"[Attempt {attempt}/{max_retries}] Cache hit: {cache_path.name}")
+                if use_parquet:
+                    # The cached artifact is the processed artifact
+                    shutil.copyfile(cache_path, out_file)
+                load_conn = None
+                load_committed = False
+                rows_pending = 0
+                try:
+                    batches = pq.ParquetFile(cache_path).iter_batches()
+                    for i, batch in enumerate(batches):
+                        df_transformed = batch.to_pandas()
+                        stats.rows_extracted += len(df_transformed)
+                        stats.rows_transformed += len(df_transformed)
+                        if not use_parquet:
+                            df_transformed.to_csv(out_file, mode='a', header=(i == 0), index=False)
+                        if load_enabled:
+                            try:
+                                if load_conn is None:
+                                    df_transformed.head(0).to_sql(
+                                        csv_file.stem, engine,
+                                        if_exists='append', index=False
+                                    )
+                                    load_conn = engine.raw_connection()
+                                rows_pending += _copy_chunks(
+                                    load_conn, df_transformed, csv_file.stem
+                                )
+                            except Exception as e:
+                                logger.warning(f"Database load skipped: {e}")
+                                load_enabled = False
+                    if load_conn is not None and load_enabled:
+                        load_conn.commit()
+                        load_committed = True
+                        stats.rows_loaded += rows_pending
+                finally:
+                    if load_conn is not None:
+                        if not load_committed:
+                            try:
+                                load_conn.rollback()
+                            except Exception:
+                                pass
+                        load_conn.close()
+                logger.info(f"✓ {csv_file.name} processed from cache")
+                stats.files_processed += 1
+                return True
+
+            # Stream extract -> transform -> save/load one chunk at a
+            # time; the full frame is never held in memory. Transformed
+            # chunks are also spooled to a Parquet cache for the next run.
+            logger.info(f"[Attempt {attempt}/{max_retries}] Streaming...")
+            cache_tmp = cache_path.with_name(cache_path.name + ".tmp")
+            cache_writer = None
+            out_writer = None
+            cache_ok = pq is not None and not use_parquet
+            load_conn = None
+            load_committed = False
+            rows_pending = 0
+            try:
+                with extract_csv_iter(csv_file, **read_kwargs) as reader:
+                    for i, chunk in enumerate(reader):
+                        stats.rows_extracted += len(chunk)
+
+                        df_transformed = transform(chunk, normalize_cols=True,
+                                                   handle_missing='drop_all',
+                                                   convert_types=convert_types)
+                        stats.rows_transformed += len(df_transformed)
+
+                        if use_parquet:
+                            table = pa.Table.from_pandas(df_transformed, preserve_index=False)
+                            if out_writer is None:
+                                out_writer = pq.ParquetWriter(
+                                    out_file, _widen_schema(table.schema),
+                                    compression='zstd'
+                                )
+                            # Cast to the writer schema: dtypes can drift
+                            # between chunks (int -> float on first NaN)
+                            out_writer.write_table(table.cast(out_writer.schema))
+                        else:
+                            df_transformed.to_csv(out_file, mode='a', header=(i == 0), index=False)
+                        rows_saved += len(df_transformed)
+
+                        if cache_ok:
+                            try:
+                                table = pa.Table.from_pandas(df_transformed, preserve_index=False)
+                                if cache_writer is None:
+                                    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                                    cache_writer = pq.ParquetWriter(
+                                        cache_tmp, _widen_schema(table.schema),
+                                        compression='zstd'
+                                    )
+                                cache_writer.write_table(table.cast(cache_writer.schema))
+                            except Exception as e:
+                                logger.debug(f"Parquet caching disabled for {csv_file.name}: {e}")
+                                cache_ok = False
+
+                        if load_enabled:
+                            try:
+                                if load_conn is None:
+                                    # Create the table outside the data
+                                    # transaction, then hold one
+                                    # transaction for every chunk COPY
+                                    df_transformed.head(0).to_sql(
+                                        csv_file.stem, engine,
+                                        if_exists='append', index=False
+                                    )
+                                    load_conn = engine.raw_connection()
+                                rows_pending += _copy_chunks(
+                                    load_conn, df_transformed, csv_file.stem
+                                )
+                            except Exception as e:
+                                logger.warning(f"Database load skipped: {e}")
+                                load_enabled = False
+
+                # One commit (and one fsync) for the whole file
+                if load_conn is not None and load_enabled:
+                    load_conn.commit()
+                    load_committed = True
+                    stats.rows_loaded += rows_pending
+            finally:
+                if out_writer is not None:
+                    out_writer.close()
+                if cache_writer is not None:
+                    cache_writer.close()
+                if load_conn is not None:
+                    if not load_committed:
+                        try:
+                            load_conn.rollback()
+                        except Exception:
+                            pass
+                    load_conn.close()
+
+            if use_parquet and out_writer is not None:
+                # The processed Parquet doubles as the cache artifact
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(out_file, cache_path)
+            if cache_writer is not None and cache_ok:
+                cache_tmp.replace(cache_path)
+            elif cache_tmp.exists():
+                cache_tmp.unlink()
+
+            logger.info(f"Saved {rows_saved} rows to {out_file}")
             logger.info(f"✓ {csv_file.name} processed successfully")
             stats.files_processed += 1
             return True
@@ -128,6 +393,42 @@ def process_file(csv_file: Path, stats: PipelineStats, max_retries: int = 3) ->
     
     return False
 
+def process_file_worker(csv_file: Path, max_retries: int = 3) -> dict:
+    """
+    Process one file in a worker process.
+
+    Workers cannot share the parent's PipelineStats or engine, so each
+    builds its own (the engine cache keeps it to one pool per process)
+    and returns a picklable stats dict for the parent to merge.
+
+    Args:
+        csv_file: Path to CSV file
+        max_retries: Number of retry attempts
+
+    Returns:
+        dict: Per-file statistics for PipelineStats.merge
+    """
+    stats = PipelineStats()
+    engine = None
+    if os.getenv("POSTGRES_HOST"):
+        db_manager = DatabaseManager()
+        try:
+            db_manager.connect()
+            engine = db_manager.engine
+        except LoadError as e:
+            logger.warning(f"Database loads disabled: {e}")
+
+    success = process_file(csv_file, stats, max_retries=max_retries, engine=engine)
+    return {
+        'success': success,
+        'files_processed': stats.files_processed,
+        'files_failed': stats.files_failed,
+        'rows_extracted': stats.rows_extracted,
+        'rows_transformed': stats.rows_transformed,
+        'rows_loaded': stats.rows_loaded,
+        'errors': stats.errors,
+    }
+
 def run():
     """Execute the ETL pipeline."""
     start_time = datetime.now()
@@ -152,10 +453,38 @@ def run():
     logger.info(f"Found {len(csv_files)} CSV file(s) to process:")
     for f in csv_files:
         logger.info(f"  - {f.name}")
-    
-    # Process each file
-    for csv_file in csv_files:
-        process_file(csv_file, stats)
+
+    # Files are independent, so fan out across processes; CSV parsing
+    # is CPU-bound, which makes processes (not threads) the right tool
+    max_workers = min(len(csv_files), os.cpu_count() or 1)
+    if max_workers > 1:
+        logger.info(f"Processing files with {max_workers} worker processes")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(process_file_worker, f): f for f in csv_files}
+            for future in as_completed(futures):
+                csv_file = futures[future]
+                try:
+                    stats.merge(future.result())
+                except Exception as e:
+                    error_msg = f"{csv_file.name}: Worker failed: {e}"
+                    logger.error(f"✗ {error_msg}")
+                    stats.errors.append(error_msg)
+                    stats.files_failed += 1
+    else:
+        # Single file: build the engine in-process and pass it down
+        engine = None
+        if os.getenv("POSTGRES_HOST"):
+            db_manager = DatabaseManager()
+            try:
+                db_manager.connect()
+                engine = db_manager.engine
+            except LoadError as e:
+                logger.warning(f"Database loads disabled: {e}")
+        else:
+            logger.debug("POSTGRES_HOST not set, skipping database loads")
+
+        for csv_file in csv_files:
+            process_file(csv_file, stats, engine=engine)
     
     # Log final statistics
     stats.log_stats()
@@ -1,30 +1,34 @@
 """
 Robust data transformation module with comprehensive data cleaning.
 """
+import string
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_BANNER = '=' * 70
+
 class TransformError(Exception):
     """Raised when transformation fails."""
     pass
 
+@dataclass(slots=True)
 class TransformStats:
     """Track transformation statistics."""
-    def __init__(self):
-        self.rows_before = 0
-        self.rows_after = 0
-        self.columns_before = 0
-        self.columns_after = 0
-        self.duplicates_removed = 0
-        self.rows_dropped = 0
-        self.conversions = 0
-        self.duration_seconds = 0.0
-    
+    rows_before: int = 0
+    rows_after: int = 0
+    columns_before: int = 0
+    columns_after: int = 0
+    duplicates_removed: int = 0
+    rows_dropped: int = 0
+    conversions: int = 0
+    duration_seconds: float = 0.0
+
     def report(self) -> str:
         """Generate transformation report."""
         rows_reduced = self.rows_before - self.rows_after
@@ -42,18 +46,40 @@ class TransformStats:
 ║ Duration:              {self.duration_seconds:>8.2f}s  ║
 ╚════════════════════════════════════════╝"""
 
+# One-pass sanitizer: keep alphanumerics and '_', map space/dash to '_',
+# drop the rest.
+# str.translate is a C-level table lookup per character, with no regex
+# machinery and no Python bytecode dispatch.
+class _DeleteMissing(dict):
+    """translate() table that drops non-alphanumeric code points.
+
+    Code points without an entry are kept when they are alphanumeric
+    (so Unicode headers like 'Año' keep their letters) and deleted
+    otherwise (degree signs, trademarks, smart punctuation). Decisions
+    are memoized into the table, so each code point pays the isalnum()
+    check once.
+    """
+    def __missing__(self, key):
+        val = key if chr(key).isalnum() else None
+        self[key] = val
+        return val
+
+_KEEP = set(string.ascii_lowercase + string.digits + '_')
+_NORMALIZE_TABLE = _DeleteMissing({ord(c): ord(c) for c in _KEEP})
+_NORMALIZE_TABLE.update({ord(' '): ord('_'), ord('-'): ord('_')})
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize column names to snake_case."""
     try:
-        new_columns = []
-        for col in df.columns:
-            new_col = str(col).strip().lower()
-            new_col = new_col.replace(' ', '_').replace('-', '_')
-            new_col = ''.join(c if c.isalnum() or c == '_' else '' for c in new_col)
-            new_col = new_col.strip('_')
-            new_columns.append(new_col)
-        
-        df.columns = new_columns
+        # Vectorized .str kernels run the whole Index per step instead of
+        # dispatching Python bytecode per column name; matters on wide frames
+        cols = pd.Index(df.columns).astype(str)
+        df.columns = (
+            cols.str.strip()
+                .str.lower()
+                .str.translate(_NORMALIZE_TABLE)
+                .str.strip('_')
+        )
         logger.info(f"✓ Normalized {len(df.columns)} column names")
         return df
     except Exception as e:
@@ -61,48 +87,95 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 def remove_duplicates(df: pd.DataFrame, subset: Optional[List[str]] = None) -> tuple:
     """Remove duplicate rows."""
-    initial = len(df)
     try:
-        df = df.drop_duplicates(subset=subset, keep='first')
-        removed = initial - len(df)
+        # Mask first: when nothing is duplicated the frame is returned
+        # as-is instead of paying drop_duplicates' full copy
+        dup_mask = df.duplicated(subset=subset, keep='first')
+        removed = int(dup_mask.sum())
         if removed > 0:
+            df = df.loc[~dup_mask]
             logger.info(f"✓ Removed {removed:,d} duplicate rows")
         return df, removed
     except Exception as e:
         raise TransformError(f"Duplicate removal failed: {e}") from e
 
+def _is_numeric_block(df: pd.DataFrame) -> bool:
+    """True when every column is a plain NumPy numeric (or bool) dtype."""
+    return len(df.columns) > 0 and all(
+        isinstance(dt, np.dtype) and dt.kind in 'buif' for dt in df.dtypes
+    )
+
 def handle_missing_values(df: pd.DataFrame, strategy: str = 'drop_all') -> tuple:
     """Handle missing values."""
-    initial = len(df)
+    removed = 0
     try:
-        if strategy == 'drop_all':
-            df = df.dropna(how='all')
-        elif strategy == 'drop_any':
-            df = df.dropna(how='any')
+        if strategy in ('drop_all', 'drop_any'):
+            # Boolean mask instead of dropna: the clean case costs no
+            # copy, and under copy-on-write the .loc slice defers it
+            if _is_numeric_block(df):
+                # All-numeric frames reduce to one fused isnan pass over
+                # the 2-D block instead of per-column pandas dispatch
+                isnan = np.isnan(df.to_numpy())
+                if strategy == 'drop_all':
+                    mask = ~isnan.all(axis=1)
+                else:
+                    mask = ~isnan.any(axis=1)
+            elif strategy == 'drop_all':
+                mask = df.notna().any(axis=1).to_numpy()
+            else:
+                mask = df.notna().all(axis=1).to_numpy()
+            removed = int(len(df) - mask.sum())
+            if removed > 0:
+                df = df.loc[mask]
         elif strategy == 'fill_mean':
             numeric = df.select_dtypes(include=[np.number]).columns
             df[numeric] = df[numeric].fillna(df[numeric].mean())
-        
-        removed = initial - len(df)
+
         if removed > 0:
             logger.info(f"✓ Handled missing values: {removed:,d} rows ({strategy})")
         return df, removed
     except Exception as e:
         raise TransformError(f"Missing value handling failed: {e}") from e
 
+# Rows sampled per column before attempting a full numeric coercion
+_NUMERIC_SAMPLE_ROWS = 1000
+
+def _sample_is_numeric(series: pd.Series) -> bool:
+    """
+    Cheap pre-screen for numeric coercion.
+
+    Parses only a head sample so obviously textual columns are rejected
+    without paying a full-column to_numeric pass; the full pass still
+    has the final say for columns that survive the sample.
+    """
+    sample = series.dropna().head(_NUMERIC_SAMPLE_ROWS)
+    if sample.empty:
+        return True
+    return not pd.to_numeric(sample, errors='coerce').isna().any()
+
 def convert_dtypes(df: pd.DataFrame) -> tuple:
     """Auto-convert column types."""
     conversions = 0
     try:
+        # Cheaply reclaim object columns that already hold numeric values
+        df = df.infer_objects()
         for col in df.select_dtypes(include=['object']).columns:
-            try:
-                df[col] = pd.to_numeric(df[col])
+            if _sample_is_numeric(df[col]):
+                # errors='coerce' never raises; accept the conversion only
+                # when it is lossless (no non-null value coerced to NaN)
+                converted = pd.to_numeric(df[col], errors='coerce')
+                if not (converted.isna() & df[col].notna()).any():
+                    df[col] = converted
+                    conversions += 1
+                    continue
+            # Low-cardinality strings dictionary-encode to integer codes,
+            # cutting memory and downstream COPY bandwidth several-fold
+            if len(df) > 0 and df[col].nunique() / len(df) < 0.5:
+                df[col] = df[col].astype('category')
                 conversions += 1
-            except (ValueError, TypeError):
-                pass
-        
+
         if conversions > 0:
-            logger.info(f"✓ Auto-converted {conversions} columns to numeric")
+            logger.info(f"✓ Auto-converted {conversions} columns")
         return df, conversions
     except Exception as e:
         raise TransformError(f"Type conversion failed: {e}") from e
@@ -129,9 +202,9 @@ def transform(df: pd.DataFrame,
     stats = TransformStats()
     
     try:
-        logger.info(f"{'='*70}")
+        logger.info(_BANNER)
         logger.info("TRANSFORMING DATA")
-        logger.info(f"{'='*70}")
+        logger.info(_BANNER)
         
         if not isinstance(df, pd.DataFrame):
             raise TransformError(f"Expected DataFrame, got {type(df)}")
@@ -159,7 +232,8 @@ def transform(df: pd.DataFrame,
         stats.columns_after = len(df.columns)
         stats.duration_seconds = (datetime.now() - start).total_seconds()
         
-        logger.info(stats.report())
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(stats.report())
         logger.info(f"✓ Transformation complete in {stats.duration_seconds:.2f}s\n")
         
         return df
@@ -171,6 +245,86 @@ def transform(df: pd.DataFrame,
         logger.error(msg)
         raise TransformError(msg) from e
 
+# Compiled per-schema transforms, keyed by the schema's items
+_COMPILED_TRANSFORMS: Dict[frozenset, Callable] = {}
+
+# Kind checks compiled into specialized transforms: a column whose dtype
+# already satisfies the target kind (e.g. Arrow-backed int64 from the
+# pyarrow reader) is accepted as-is rather than forced onto the NumPy
+# backend, mirroring what transform() does
+_DTYPE_KIND_CHECKS = {
+    'i': 'pd.api.types.is_integer_dtype',
+    'u': 'pd.api.types.is_integer_dtype',
+    'f': 'pd.api.types.is_float_dtype',
+    'b': 'pd.api.types.is_bool_dtype',
+    'U': 'pd.api.types.is_string_dtype',
+    'O': 'pd.api.types.is_string_dtype',
+}
+
+def compile_transform(schema: Dict[str, str]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """
+    Generate a transform specialized to a known, fixed schema.
+
+    The rename list and dtype casts are baked into generated source and
+    exec()'d once at registration time, so the per-frame call does no
+    name sanitizing, no dict lookups and no dtype dispatch. Casts only
+    fire when a column does not already carry the target kind, so
+    Arrow-backed frames keep their backend and output matches
+    transform() for frames carrying exactly this schema. Compiled
+    functions are cached by schema, so repeated registration returns
+    the same object.
+
+    Args:
+        schema: Mapping of incoming column name to target dtype string,
+            in column order (e.g. {'Sales Amount': 'int64'})
+
+    Returns:
+        Callable taking and returning a DataFrame
+
+    Raises:
+        TransformError: If the generated source fails to compile
+    """
+    key = frozenset(schema.items())
+    cached = _COMPILED_TRANSFORMS.get(key)
+    if cached is not None:
+        return cached
+
+    normalized = [
+        str(col).strip().lower().translate(_NORMALIZE_TABLE).strip('_')
+        for col in schema
+    ]
+    lines = [
+        "def _specialized(df):",
+        f"    df.columns = {normalized!r}",
+    ]
+    for name, dtype in zip(normalized, schema.values()):
+        try:
+            kind = np.dtype(dtype).kind
+        except TypeError:
+            kind = None
+        check = _DTYPE_KIND_CHECKS.get(kind)
+        if check is not None:
+            lines.append(f"    if not {check}(df[{name!r}].dtype):")
+            lines.append(
+                f"        df[{name!r}] = df[{name!r}].astype({dtype!r}, copy=False)"
+            )
+        else:
+            lines.append(
+                f"    df[{name!r}] = df[{name!r}].astype({dtype!r}, copy=False)"
+            )
+    lines.append("    return df.dropna(how='all')")
+    source = "\n".join(lines)
+
+    try:
+        namespace: Dict[str, Any] = {'pd': pd}
+        exec(compile(source, f"<transform_{abs(hash(key)):x}>", "exec"), namespace)
+    except Exception as e:
+        raise TransformError(f"Failed to compile transform for schema: {e}") from e
+
+    func = namespace['_specialized']
+    _COMPILED_TRANSFORMS[key] = func
+    return func
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     print("Transform module loaded")
@@ -1,52 +1,227 @@
+import importlib.util
+import io
+import os
+import platform
 import unittest
-import pandas as pd
+from unittest import mock
+from unittest.mock import AsyncMock, MagicMock
 from pathlib import Path
 import tempfile
-import shutil
 
-from src.extract.extract_data import extract_csv
+# pandas is imported lazily inside the tests that assert on DataFrames:
+# keeping it out of module scope makes bare collection of this file cheap
+
+from src.extract.extract_data import ExtractionError, extract_csv
 from src.transform.transform_data import transform
 from src.load.load_to_db import load_df_to_postgres
 
+# Markers degrade to no-ops under plain unittest so the module keeps
+# running without pytest installed
+try:
+    import pytest
+    _slow = pytest.mark.slow
+    _timeout = pytest.mark.timeout
+except ImportError:
+    pytest = None
+
+    def _slow(func):
+        return func
+
+    def _timeout(seconds):
+        return _slow
+
+
+def _write_fixture_csv(path, data) -> None:
+    """Write a fixture CSV, using pyarrow's C++ writer when available.
+
+    Falls back to pandas' row-wise writer; only matters for the large
+    fixtures, where Arrow avoids a Python format call per cell.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        table = pa.Table.from_pydict({k: list(v) for k, v in data.items()})
+        pa_csv.write_csv(table, str(path))
+    except ImportError:
+        import pandas as pd
+        pd.DataFrame(data).to_csv(path, index=False)
+
+
+def _tmpdir() -> tempfile.TemporaryDirectory:
+    """Create a temp directory, preferring tmpfs (/dev/shm) when available.
+
+    Fixtures are written and immediately re-read, so keeping them in
+    memory skips disk write-back on CI hosts with disk-backed /tmp.
+    Returns a TemporaryDirectory so cleanup can be handed to
+    addClassCleanup instead of a hand-rolled rmtree teardown.
+    """
+    try:
+        return tempfile.TemporaryDirectory(dir='/dev/shm')
+    except OSError:
+        return tempfile.TemporaryDirectory()
+
 
 class TestExtract(unittest.TestCase):
     """Test the extract module."""
 
-    def setUp(self):
-        """Create a temporary directory and sample CSV."""
-        self.test_dir = tempfile.mkdtemp()
-        self.csv_path = Path(self.test_dir) / "test.csv"
-        
+    @classmethod
+    def setUpClass(cls):
+        """Create a temporary directory and sample CSV once for the class.
+
+        The tests only read the fixture, so sharing it is safe and avoids
+        rewriting the same file for every test method.
+        """
+        cls._tmp = _tmpdir()
+        cls.addClassCleanup(cls._tmp.cleanup)
+        cls.test_dir = cls._tmp.name
+        # Plain str: pandas calls os.fspath anyway, and building the
+        # PurePath once per class beats once per test
+        cls.csv_path = os.path.join(cls.test_dir, "test.csv")
+
         # Write test data
         test_data = {
             'id': [1, 2, 3],
             'name': ['Alice', 'Bob', 'Charlie'],
             'value': [10, 20, 30]
         }
-        pd.DataFrame(test_data).to_csv(self.csv_path, index=False)
-
-    def tearDown(self):
-        """Clean up temporary directory."""
-        shutil.rmtree(self.test_dir)
+        _write_fixture_csv(cls.csv_path, test_data)
 
     def test_extract_csv(self):
         """Test that extract_csv returns a DataFrame with correct shape."""
+        import pandas as pd
         df = extract_csv(self.csv_path)
         self.assertIsInstance(df, pd.DataFrame)
         self.assertEqual(len(df), 3)
         self.assertEqual(list(df.columns), ['id', 'name', 'value'])
 
+    def test_extract_csv_from_buffer(self):
+        """Test that extract_csv accepts an in-memory file-like object."""
+        import pandas as pd
+        buf = io.BytesIO(Path(self.csv_path).read_bytes())
+        df = extract_csv(buf)
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertEqual(len(df), 3)
+        self.assertEqual(list(df.columns), ['id', 'name', 'value'])
+
+    def test_extract_csv_chunked_from_buffer(self):
+        """Test that buffers work with chunked extraction too."""
+        buf = io.BytesIO(Path(self.csv_path).read_bytes())
+        total = 0
+        with extract_csv(buf, chunksize=2) as reader:
+            for chunk in reader:
+                total += len(chunk)
+        self.assertEqual(total, 3)
+
     def test_extract_csv_missing_file(self):
-        """Test that extract_csv raises FileNotFoundError for missing file."""
-        with self.assertRaises(FileNotFoundError):
+        """Test that extract_csv raises ExtractionError for missing file."""
+        with self.assertRaises(ExtractionError):
             extract_csv(Path(self.test_dir) / "nonexistent.csv")
 
 
+class TestExtractLarge(unittest.TestCase):
+    """Stress the extract path with a fixture big enough to exercise batching."""
+
+    ROWS = 1_000_000
+
+    @classmethod
+    def setUpClass(cls):
+        """Write a 1M-row CSV once for the class."""
+        cls._tmp = _tmpdir()
+        cls.addClassCleanup(cls._tmp.cleanup)
+        cls.test_dir = cls._tmp.name
+        cls.csv_path = os.path.join(cls.test_dir, "large.csv")
+        _write_fixture_csv(cls.csv_path, {
+            'id': range(cls.ROWS),
+            'value': range(cls.ROWS),
+        })
+
+    def test_extract_large_csv(self):
+        """Test that extract_csv handles a 1M-row file intact."""
+        df = extract_csv(self.csv_path)
+        self.assertEqual(len(df), self.ROWS)
+        self.assertEqual(list(df.columns), ['id', 'value'])
+        self.assertEqual(int(df['id'].iloc[-1]), self.ROWS - 1)
+
+    def test_extract_csv_chunked(self):
+        """Test that chunksize yields chunks that together cover the file."""
+        import pandas as pd
+        rows = 250_000
+        tmp = _tmpdir()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "chunked.csv"
+        _write_fixture_csv(path, {'id': range(rows), 'value': range(rows)})
+
+        result = extract_csv(path, chunksize=100_000)
+        self.assertNotIsInstance(result, pd.DataFrame)
+        total = 0
+        with result as reader:
+            for chunk in reader:
+                self.assertLessEqual(len(chunk), 100_000)
+                total += len(chunk)
+        self.assertEqual(total, rows)
+
+
+class TestExtractPolars(unittest.TestCase):
+    """Parity checks for the opt-in polars engine."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Write a 100k-row CSV once for the class."""
+        cls._tmp = _tmpdir()
+        cls.addClassCleanup(cls._tmp.cleanup)
+        cls.csv_path = os.path.join(cls._tmp.name, "medium.csv")
+        _write_fixture_csv(cls.csv_path, {
+            'id': range(100_000),
+            'value': range(100_000),
+        })
+
+    @unittest.skipUnless(importlib.util.find_spec('polars'), "polars not installed")
+    def test_polars_engine_parity(self):
+        """Test that engine='polars' matches the default reader's output."""
+        default = extract_csv(self.csv_path)
+        fast = extract_csv(self.csv_path, engine='polars')
+        self.assertEqual(fast.shape, default.shape)
+        self.assertEqual(list(fast.columns), list(default.columns))
+        self.assertEqual(int(fast['id'].iloc[-1]), int(default['id'].iloc[-1]))
+
+
+class TestExtractIoUring(unittest.TestCase):
+    """Parity checks for the opt-in io_uring read path."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Write a 100k-row CSV once for the class."""
+        cls._tmp = _tmpdir()
+        cls.addClassCleanup(cls._tmp.cleanup)
+        cls.csv_path = os.path.join(cls._tmp.name, "uring.csv")
+        _write_fixture_csv(cls.csv_path, {
+            'id': range(100_000),
+            'value': range(100_000),
+        })
+
+    @unittest.skipUnless(platform.system() == 'Linux', "io_uring is Linux-only")
+    @unittest.skipUnless(importlib.util.find_spec('liburing'), "liburing not installed")
+    def test_uring_engine_parity(self):
+        """Test that io_engine='uring' matches the default read path."""
+        default = extract_csv(self.csv_path)
+        via_uring = extract_csv(self.csv_path, io_engine='uring')
+        self.assertEqual(via_uring.shape, default.shape)
+        self.assertEqual(list(via_uring.columns), list(default.columns))
+        self.assertEqual(int(via_uring['id'].iloc[-1]), int(default['id'].iloc[-1]))
+
+    def test_uring_engine_fallback(self):
+        """Test the io_engine plumbing works via the blocking-read fallback."""
+        df = extract_csv(self.csv_path, io_engine='uring')
+        self.assertEqual(len(df), 100_000)
+        self.assertEqual(list(df.columns), ['id', 'value'])
+
+
 class TestTransform(unittest.TestCase):
     """Test the transform module."""
 
     def test_transform_normalizes_columns(self):
         """Test that transform converts column names to snake_case and lowercase."""
+        import pandas as pd
         df = pd.DataFrame({
             'ID': [1, 2],
             'Customer Name': ['Alice', 'Bob'],
@@ -55,8 +230,34 @@ class TestTransform(unittest.TestCase):
         result = transform(df)
         self.assertEqual(list(result.columns), ['id', 'customer_name', 'amount'])
 
+    def test_transform_strips_non_ascii(self):
+        """Test that non-ASCII symbols are stripped from column names."""
+        import pandas as pd
+        df = pd.DataFrame({
+            'Temp °C': [20, 21],
+            'Price €': [5, 6]
+        })
+        result = transform(df)
+        self.assertEqual(list(result.columns), ['temp_c', 'price'])
+
+    def test_transform_keeps_unicode_alphanumerics(self):
+        """Test that non-ASCII letters survive column normalization."""
+        import pandas as pd
+        df = pd.DataFrame({'Año': [2024, 2025]})
+        result = transform(df)
+        self.assertEqual(list(result.columns), ['año'])
+
+    def test_transform_normalizes_many_columns(self):
+        """Test that normalization holds up on a wide (1000-column) frame."""
+        import pandas as pd
+        df = pd.DataFrame([[0] * 1000], columns=[f'Col {i}' for i in range(1000)])
+        result = transform(df)
+        for name in result.columns:
+            self.assertRegex(name, r'^col_\d+$')
+
     def test_transform_removes_all_na_rows(self):
         """Test that transform removes rows with all NaN values."""
+        import pandas as pd
         df = pd.DataFrame({
             'a': [1, None, 3],
             'b': [4, None, 6]
@@ -64,8 +265,63 @@ class TestTransform(unittest.TestCase):
         result = transform(df)
         self.assertEqual(len(result), 2)
 
+    def test_transform_all_na_fastpath_1m(self):
+        """Test the numeric-block fastpath drops all-NaN rows at scale."""
+        import numpy as np
+        import pandas as pd
+        rows = 1_000_000
+        arr = np.random.default_rng(0).random((rows, 4))
+        arr[::10] = np.nan
+        df = pd.DataFrame(arr, columns=['a', 'b', 'c', 'd'])
+        result = transform(df, remove_dups=False, convert_types=False)
+        self.assertEqual(len(result), rows - rows // 10)
+
+    def test_transform_uses_block_fastpath(self):
+        """Test that all-numeric frames never touch DataFrame-level isna."""
+        import numpy as np
+        import pandas as pd
+        df = pd.DataFrame({
+            'a': [1.0, np.nan, 3.0],
+            'b': [4.0, np.nan, 6.0]
+        })
+        with mock.patch.object(pd.DataFrame, 'isna') as isna:
+            result = transform(df)
+        isna.assert_not_called()
+        self.assertEqual(len(result), 2)
+
+    def test_transform_low_card_becomes_category(self):
+        """Test that low-cardinality string columns dictionary-encode."""
+        import pandas as pd
+        names = ['Alice', 'Bob', 'Charlie', 'Dana', 'Eve']
+        df = pd.DataFrame({
+            'id': range(10_000),
+            # Explicit object dtype: the conversion targets object
+            # columns, and the shrink factor is deterministic from one
+            # Python string per cell (Arrow-backed strings are already
+            # compact, which would make a hard threshold flaky)
+            'name': pd.Series(
+                [names[i % len(names)] for i in range(10_000)], dtype='object'
+            )
+        })
+        original = df.memory_usage(deep=True).sum()
+        result = transform(df, remove_dups=False)
+        self.assertEqual(result['name'].dtype.name, 'category')
+        self.assertLess(result.memory_usage(deep=True).sum(), original / 3)
+
+    def test_transform_no_copy_when_clean(self):
+        """Test that clean frames pass through without copying their data."""
+        import numpy as np
+        import pandas as pd
+        df = pd.DataFrame({'a': [1.0, 2.0, 3.0], 'b': [4.0, 5.0, 6.0]})
+        result = transform(df)
+        self.assertEqual(len(result), 3)
+        # Nothing to drop, dedupe or convert: the blocks must be shared,
+        # not duplicated
+        self.assertTrue(np.shares_memory(result['a'].to_numpy(), df['a'].to_numpy()))
+
     def test_transform_preserves_partial_na(self):
         """Test that transform preserves rows with some NaN values."""
+        import pandas as pd
         df = pd.DataFrame({
             'a': [1, None, 3],
             'b': [4, 5, 6]
@@ -77,8 +333,11 @@ class TestTransform(unittest.TestCase):
 class TestLoad(unittest.TestCase):
     """Test the load module."""
 
+    @_slow
+    @_timeout(2)
     def test_load_df_to_postgres_requires_credentials(self):
         """Test that load_df_to_postgres attempts connection (will fail without real DB)."""
+        import pandas as pd
         df = pd.DataFrame({'id': [1, 2], 'name': ['Alice', 'Bob']})
         # This should raise an exception due to missing/invalid DB credentials
         # We're just verifying the function is callable
@@ -88,17 +347,84 @@ class TestLoad(unittest.TestCase):
             # Expected: connection error when no DB is running
             self.assertIsInstance(e, Exception)
 
+    def test_load_uses_copy(self):
+        """Test that the PostgreSQL path bulk-loads via COPY, not per-row INSERTs."""
+        import pandas as pd
+        df = pd.DataFrame({'id': range(10_000), 'value': range(10_000)})
+
+        engine = MagicMock()
+        engine.dialect.name = 'postgresql'
+        raw_conn = engine.raw_connection.return_value
+        cursor = raw_conn.cursor.return_value.__enter__.return_value
+
+        # to_sql is only allowed to create the empty table, never move rows
+        with mock.patch.object(pd.DataFrame, 'to_sql') as to_sql:
+            loaded = load_df_to_postgres(df, 'bulk_table', engine=engine)
+
+        self.assertEqual(loaded, 10_000)
+        to_sql.assert_called_once()
+        cursor.copy_expert.assert_called_once()
+        cursor.execute.assert_not_called()
+        raw_conn.commit.assert_called_once()
+
+        copy_sql, buf = cursor.copy_expert.call_args[0]
+        self.assertIn('COPY "bulk_table"', copy_sql)
+        self.assertIn('FROM STDIN', copy_sql)
+        self.assertEqual(buf.getvalue().count('\n'), 10_000)
+
+    def test_load_reuses_injected_connection(self):
+        """Test that a provided connection is reused with no new handshake."""
+        import pandas as pd
+        import psycopg2
+
+        df = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+        conn = MagicMock()
+        with mock.patch.object(psycopg2, 'connect') as pg_connect:
+            loaded = load_df_to_postgres(df, 'pooled_table', conn=conn)
+
+        self.assertEqual(loaded, 2)
+        pg_connect.assert_not_called()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.copy_expert.assert_called_once()
+        conn.commit.assert_called_once()
+        # The caller owns the pooled connection's lifecycle
+        conn.close.assert_not_called()
+
+
+class TestLoadAsync(unittest.IsolatedAsyncioTestCase):
+    """Test the asyncpg bulk-load path."""
+
+    async def test_load_uses_copy_records(self):
+        """Test that the async loader goes through copy_records_to_table."""
+        import pandas as pd
+        from src.load.load_to_db import load_df_to_postgres_async
+
+        df = pd.DataFrame({'id': [1, 2, 3], 'name': ['a', 'b', 'c']})
+        conn = AsyncMock()
+        loaded = await load_df_to_postgres_async(df, 'async_table', conn=conn)
+
+        self.assertEqual(loaded, 3)
+        conn.copy_records_to_table.assert_awaited_once()
+        kwargs = conn.copy_records_to_table.await_args.kwargs
+        self.assertEqual(list(kwargs['columns']), ['id', 'name'])
+        self.assertEqual(len(list(kwargs['records'])), 3)
+        # Injected connections stay open; the caller owns their lifecycle
+        conn.close.assert_not_awaited()
+
 
 class TestPipelineIntegration(unittest.TestCase):
     """Integration tests for the full ETL pipeline."""
 
-    def setUp(self):
-        """Create temporary test directories."""
-        self.test_dir = tempfile.mkdtemp()
-        self.raw_dir = Path(self.test_dir) / "raw"
-        self.processed_dir = Path(self.test_dir) / "processed"
-        self.raw_dir.mkdir()
-        self.processed_dir.mkdir()
+    @classmethod
+    def setUpClass(cls):
+        """Create temporary test directories once for the class."""
+        cls._tmp = _tmpdir()
+        cls.addClassCleanup(cls._tmp.cleanup)
+        cls.test_dir = cls._tmp.name
+        cls.raw_dir = Path(cls.test_dir) / "raw"
+        cls.processed_dir = Path(cls.test_dir) / "processed"
+        cls.raw_dir.mkdir()
+        cls.processed_dir.mkdir()
 
         # Write sample data
         test_data = {
@@ -106,21 +432,44 @@ class TestPipelineIntegration(unittest.TestCase):
             'Customer Name': ['Alice', 'Bob', 'Charlie'],
             'Sales Amount': [100, 200, 300]
         }
-        pd.DataFrame(test_data).to_csv(self.raw_dir / "test.csv", index=False)
-
-    def tearDown(self):
-        """Clean up temporary directories."""
-        shutil.rmtree(self.test_dir)
+        cls.csv_path = os.path.join(cls.raw_dir, "test.csv")
+        _write_fixture_csv(cls.csv_path, test_data)
 
     def test_extract_transform_round_trip(self):
         """Test extracting and transforming data."""
-        df = extract_csv(self.raw_dir / "test.csv")
+        df = extract_csv(self.csv_path)
         df_transformed = transform(df)
         
         # Verify transform worked
         self.assertEqual(list(df_transformed.columns), ['id', 'customer_name', 'sales_amount'])
         self.assertEqual(len(df_transformed), 3)
 
+    def test_compile_transform_matches_generic(self):
+        """Test that a schema-compiled transform matches the generic path."""
+        import pandas as pd
+        from src.transform.transform_data import compile_transform
+
+        df = extract_csv(self.csv_path)
+        generic = transform(df.copy())
+        specialized = compile_transform({
+            'ID': 'int64',
+            'Customer Name': 'str',
+            'Sales Amount': 'int64'
+        })
+        pd.testing.assert_frame_equal(specialized(df.copy()), generic)
+
+    def test_compile_transform_cached(self):
+        """Test that compiling the same schema twice returns one function."""
+        from src.transform.transform_data import compile_transform
+
+        schema = {'ID': 'int64', 'Customer Name': 'str', 'Sales Amount': 'int64'}
+        self.assertIs(compile_transform(schema), compile_transform(dict(schema)))
+
 
 if __name__ == '__main__':
+    if pytest is not None and importlib.util.find_spec('xdist'):
+        # Test classes are independent and I/O-bound; fan them out
+        # across cores (filter the DB timeout test with -m 'not slow')
+        import sys
+        sys.exit(pytest.main([__file__, '-n', 'auto']))
     unittest.main()